@@ -12,3 +12,13 @@ COEFFICIENT_PREFERENCE_IF_NOT_OTHERWISE_POSSIBLE = 30
 COEFFICIENT_SLOT_PENALTY_EVENING_HOURS = 50
 COEFFICIENT_PREFERENCE_NOT_AVAILABLE = 100
 COEFFICIENT_SLOT_PENALTY_LUNCH_BREAK = 1000
+
+# Coefficients of the teacher slot preferences, indexed by the preference value used in Teachers.csv.
+PREFERENCE_COEFFICIENTS = [
+    COEFFICIENT_PREFERENCE_NEUTRAL,
+    COEFFICIENT_PREFERENCE_NOT_AVAILABLE,
+    COEFFICIENT_PREFERENCE_IF_NOT_OTHERWISE_POSSIBLE,
+    COEFFICIENT_PREFERENCE_PREFERABLY_NOT,
+    COEFFICIENT_PREFERENCE_IDEALLY_YES,
+    COEFFICIENT_PREFERENCE_STRONG_PREFERENCE,
+]
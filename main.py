@@ -3,61 +3,78 @@ Project : Schedule Creator
 Version : 0.4.0
 Date    : November 2023
 """
-from typing import List
+from typing import Dict, List
 
 from pulp import *
 
 import output
-from models import DataStorage, SemesterSchedule, with_storage
+import utils
+from models import DataStorage, SemesterSchedule, get_storage, with_storage
 
 
 @with_storage
-def set_global_constraints(model: LpProblem, semester_schedules: List[SemesterSchedule], storage: DataStorage) -> None:
-    """Sets the global constraints.
+def get_global_constraints(semester_schedules: List[SemesterSchedule], storage: DataStorage) -> Dict[str, LpConstraint]:
+    """Gets the global constraints.
 
     Args:
-        model (LpProblem): The PuLP model.
         semester_schedules (List[SemesterSchedule]): The list of semester schedules.
         storage (DataStorage): This parameter is automatically injected.
+
+    Returns:
+        Dict[str, LpConstraint]: The constraints by name.
     """
 
+    # Groups the rows of the variables matrices by teacher, so that the classes are only scanned once.
+    teacher_rows = {teacher_id: [] for teacher_id in storage.teachers}
+
+    for semester_schedule in semester_schedules:
+        for j, class_ in enumerate(semester_schedule.semester.classes):
+            for teacher in class_.teachers:
+                teacher_rows[teacher.id].append(semester_schedule.variables_matrix[j])
+
     # Prevents a teacher from teaching 2 classes at the same time.
-    for teacher in storage.teachers.values():
-        for i in range(len(storage.slots)):
-            x = 0
+    constraints = {}
 
-            for semester_schedule in semester_schedules:
-                for j, class_ in enumerate(semester_schedule.semester.classes):
-                    if class_.contains_teacher(teacher):
-                        x += semester_schedule.variables_matrix[j][i]
+    for teacher_id, rows in teacher_rows.items():
+        if not rows:
+            continue
 
-            model += x <= 1
+        for i in range(len(storage.slots)):
+            constraints[f"teacher_{teacher_id}_{i}"] = lpSum(row[i] for row in rows) <= 1
 
+    return constraints
 
-@with_storage
-def main(storage: DataStorage) -> None:
+
+def main() -> None:
+    storage = get_storage()
     model = LpProblem("Schedule_Creator", LpMinimize)
-    objective_function = 0
+    objective_functions = []
+    constraints = {}
 
     semester_schedules = []
 
     for semester in storage.classes_by_semester:
         semester_schedule = SemesterSchedule(semester)
 
-        objective_function += semester_schedule.get_objective_function()
-        semester_schedule.set_constraints(model)
+        objective_functions.append(semester_schedule.get_objective_function())
+        constraints.update(semester_schedule.get_constraints())
 
         semester_schedules.append(semester_schedule)
 
-    set_global_constraints(model, semester_schedules)
+    constraints.update(get_global_constraints(semester_schedules))
 
-    model += objective_function
-    model.solve()
+    model += lpSum(objective_functions)
+    model.extend(constraints)
+    warm_start = utils.supports_warm_start() and utils.load_solution(model)
+    model.solve(utils.get_solver(warm_start))
 
     if model.status != LpStatusOptimal:
         print("STOP")
         return
 
+    if utils.supports_warm_start():
+        utils.save_solution(model)
+
     print(f"{len(model.variables())} variables")
     print(f"{len(model.constraints)} constraints")
     print()
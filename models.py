@@ -1,24 +1,13 @@
 from __future__ import annotations
 
-import math
-from typing import List
+from typing import Dict, List, Optional
 
-from pulp import LpAffineExpression, LpProblem, LpVariable
+import numpy as np
+from pulp import LpAffineExpression, LpConstraint, lpSum
 
 import constants
 
 
-class Singleton(type):
-    """Singleton is a metaclass for making a class a Singleton."""
-
-    _instances = {}
-
-    def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-        return cls._instances[cls]
-
-
 class Semester:
     """Represents a semester with its classes."""
 
@@ -35,20 +24,21 @@ class Semester:
 
     def init_groups(self) -> None:
         """Initializes the groups."""
-        groups = {1: Group(1, "")}
-        identifiers = {"": 1}
+        groups_by_name = {"": Group(1, "")}
         id = 2
 
         for class_ in self.classes:
-            if not class_.group_name in identifiers:
-                identifiers[class_.group_name] = id
-                groups[id] = Group(id, class_.group_name)
+            group = groups_by_name.get(class_.group_name)
+
+            if group is None:
+                group = Group(id, class_.group_name)
+                groups_by_name[class_.group_name] = group
                 id += 1
 
-            groups[identifiers[class_.group_name]].classes.append(class_)
+            group.classes.append(class_)
 
-        self.groups = list(groups.values())
-        self.groups = [self.groups[0]] + sorted(self.groups[1:], key=lambda x: x.name)
+        common_group = groups_by_name.pop("")
+        self.groups = [common_group] + sorted(groups_by_name.values(), key=lambda x: x.name)
 
     def sort_classes(self) -> None:
         """Sorts the classes."""
@@ -94,17 +84,6 @@ class Class_:
         self.slot_count = slot_count
         self.teachers = teachers
 
-    def contains_teacher(self, teacher: Teacher) -> bool:
-        """Checks if the teacher teaches this class.
-
-        Args:
-            teacher (Teacher): The teacher.
-
-        Returns:
-            bool: True, if the teacher teaches this class otherwise False.
-        """
-        return teacher.id in [x.id for x in self.teachers]
-
 
 class Group:
     """Represents a group."""
@@ -142,6 +121,11 @@ class Teacher:
         self.first_name = first_name
         self.slot_preferences = slot_preferences
 
+        # Only the slots whose preference has a non-zero coefficient contribute to the objective function.
+        coefficients = [None if x is None else constants.PREFERENCE_COEFFICIENTS[x] for x in slot_preferences]
+        self.preference_slot_indices = np.array([i for i, x in enumerate(coefficients) if x], dtype=np.int32)
+        self.preference_coefficients = np.array([coefficients[i] for i in self.preference_slot_indices], dtype=np.float64)
+
 
 class Slot:
     """Represents a time slot."""
@@ -165,8 +149,8 @@ class Slot:
         self.is_evening = is_evening
 
 
-class DataStorage(metaclass=Singleton):
-    """Represents the data storage. This class is a Singleton."""
+class DataStorage:
+    """Represents the data storage. The shared instance is obtained with get_storage."""
 
     def __init__(self) -> None:
         """Creates a new instance of the DataStorage class."""
@@ -183,11 +167,29 @@ class DataStorage(metaclass=Singleton):
 
                 class_.teachers = class_teachers
 
+        self.slot_count_per_day = utils.get_slot_count_per_day_(len(self.slots))
+        self.first_hour_slot_indices = tuple(i * self.slot_count_per_day for i in range(constants.NUMBER_OF_CLASS_DAYS))
+        self.lunch_slot_indices = tuple(i for i, slot in enumerate(self.slots) if slot.is_lunch_break)
+        self.evening_slot_indices = tuple(i for i, slot in enumerate(self.slots) if slot.is_evening)
+
+
+def get_storage() -> DataStorage:
+    """Gets the shared data storage, it is created on first use.
+
+    Returns:
+        DataStorage: The shared data storage.
+    """
+    global STORAGE
+
+    if STORAGE is None:
+        STORAGE = DataStorage()
+
+    return STORAGE
+
 
 def with_storage(func):
     def wrapper(*args, **kwargs):
-        storage = DataStorage()
-        return func(*args, storage, **kwargs)
+        return func(*args, storage=get_storage(), **kwargs)
 
     return wrapper
 
@@ -195,18 +197,18 @@ def with_storage(func):
 class SemesterSchedule:
     """Represents a semester schedule."""
 
-    @with_storage
-    def __init__(self, semester: Semester, storage: DataStorage) -> None:
+    def __init__(self, semester: Semester) -> None:
         """Creates a new instance of the SemesterSchedule class.
 
         Args:
             semester (Semester): The semester for which a schedule will be calculated.
-            storage (DataStorage): This parameter is automatically injected.
         """
+        storage = get_storage()
+
         self.semester = semester
         self.variables_matrix = self._create_variables_matrix(len(self.semester.classes), len(storage.slots))
 
-    def _create_variables_matrix(self, m: int, n: int) -> List[List[LpVariable]]:
+    def _create_variables_matrix(self, m: int, n: int) -> np.ndarray:
         """Creates the variables matrix.
 
         Args:
@@ -214,17 +216,9 @@ class SemesterSchedule:
             n (int): The number of columns.
 
         Returns:
-            List[List[LpVariable]]: The variables matrix
+            np.ndarray: The variables matrix, an m x n array of LpVariable.
         """
-        variables = []
-
-        for i in range(m):
-            variables.append([])
-
-            for j in range(n):
-                variables[-1].append(utils.create_binary_variable(f"{self.semester.id}_X_{i},{j}"))
-
-        return variables
+        return utils.create_binary_variables_matrix(f"{self.semester.id}_X_%s,%s", m, n)
 
     def _get_objective_function_unallocated_class_slots(self) -> LpAffineExpression:
         """Minimizes the number of unallocated class slots.
@@ -232,14 +226,7 @@ class SemesterSchedule:
         Returns:
             LpAffineExpression: A fragment of the objective function.
         """
-        objective_function = 0
-
-        for i in range(len(self.variables_matrix)):
-            for j in range(len(self.variables_matrix[0])):
-                objective_function += self.variables_matrix[i][j]
-
-        objective_function = -objective_function
-        return objective_function
+        return -lpSum(self.variables_matrix.ravel())
 
     def _get_objective_function_teachers_slot_preferences(self) -> LpAffineExpression:
         """Takes teachers' preferences into account.
@@ -247,27 +234,15 @@ class SemesterSchedule:
         Returns:
             LpAffineExpression: A fragment of the objective function.
         """
-        objective_function = 0
-        preference_coefficients = [
-            constants.COEFFICIENT_PREFERENCE_NEUTRAL,
-            constants.COEFFICIENT_PREFERENCE_NOT_AVAILABLE,
-            constants.COEFFICIENT_PREFERENCE_IF_NOT_OTHERWISE_POSSIBLE,
-            constants.COEFFICIENT_PREFERENCE_PREFERABLY_NOT,
-            constants.COEFFICIENT_PREFERENCE_IDEALLY_YES,
-            constants.COEFFICIENT_PREFERENCE_STRONG_PREFERENCE,
-        ]
-
-        for i in range(len(self.variables_matrix)):
-            for teacher in self.semester.classes[i].teachers:
-                for j, slot_preference in enumerate(teacher.slot_preferences):
-                    if slot_preference is None:
-                        continue
-
-                    variable = self.variables_matrix[i][j]
-                    coefficient = preference_coefficients[slot_preference]
-                    class_slot_count = self.semester.classes[i].slot_count
-
-                    objective_function += variable * coefficient / class_slot_count
+        objective_function = LpAffineExpression()
+
+        for row, class_ in zip(self.variables_matrix, self.semester.classes):
+            class_slot_count = class_.slot_count
+
+            for teacher in class_.teachers:
+                for j, coefficient in zip(teacher.preference_slot_indices, teacher.preference_coefficients):
+                    # A class may have several teachers, so the same variable can get several terms.
+                    objective_function.addterm(row[j], coefficient / class_slot_count)
 
         return objective_function
 
@@ -277,138 +252,129 @@ class SemesterSchedule:
         Returns:
             LpAffineExpression: A fragment of the objective function.
         """
-        objective_function = 0
-        slot_count_per_day = utils.get_slot_count_per_day()
+        storage = get_storage()
+        terms = []
 
-        for i in range(len(self.variables_matrix)):
-            for j in range(constants.NUMBER_OF_CLASS_DAYS):
-                variable = self.variables_matrix[i][j * slot_count_per_day]
-                coefficient = constants.COEFFICIENT_SLOT_PENALTY_FIRST_HOUR
-                class_slot_count = self.semester.classes[i].slot_count
+        coefficient = constants.COEFFICIENT_SLOT_PENALTY_FIRST_HOUR
 
-                objective_function += variable * coefficient / class_slot_count
+        for row, class_ in zip(self.variables_matrix, self.semester.classes):
+            class_coefficient = coefficient / class_.slot_count
 
-        return objective_function
+            for j in storage.first_hour_slot_indices:
+                terms.append((row[j], class_coefficient))
 
-    @with_storage
-    def _get_objective_function_penalize_lunch_break(self, storage: DataStorage) -> LpAffineExpression:
-        """Penalizes the lunch break hour.
+        return LpAffineExpression(terms)
 
-        Args:
-            storage (DataStorage): This parameter is automatically injected.
+    def _get_objective_function_penalize_lunch_break(self) -> LpAffineExpression:
+        """Penalizes the lunch break hour.
 
         Returns:
             LpAffineExpression: A fragment of the objective function.
         """
-        objective_function = 0
+        storage = get_storage()
+        terms = []
 
-        for i in range(len(self.variables_matrix)):
-            for j in range(len(self.variables_matrix[0])):
-                if storage.slots[j].is_lunch_break:
-                    variable = self.variables_matrix[i][j]
-                    coefficient = constants.COEFFICIENT_SLOT_PENALTY_LUNCH_BREAK
-                    class_slot_count = self.semester.classes[i].slot_count
+        coefficient = constants.COEFFICIENT_SLOT_PENALTY_LUNCH_BREAK
 
-                    objective_function += variable * coefficient / class_slot_count
+        for row, class_ in zip(self.variables_matrix, self.semester.classes):
+            class_coefficient = coefficient / class_.slot_count
 
-        return objective_function
+            for j in storage.lunch_slot_indices:
+                terms.append((row[j], class_coefficient))
 
-    @with_storage
-    def _get_objective_function_penalize_evening_hours(self, storage: DataStorage) -> LpAffineExpression:
-        """Penalizes the evening hours.
+        return LpAffineExpression(terms)
 
-        Args:
-            storage (DataStorage): This parameter is automatically injected.
+    def _get_objective_function_penalize_evening_hours(self) -> LpAffineExpression:
+        """Penalizes the evening hours.
 
         Returns:
             LpAffineExpression: A fragment of the objective function.
         """
-        objective_function = 0
+        storage = get_storage()
+        terms = []
 
-        for i in range(len(self.variables_matrix)):
-            for j in range(len(self.variables_matrix[0])):
-                if storage.slots[j].is_evening:
-                    variable = self.variables_matrix[i][j]
-                    coefficient = constants.COEFFICIENT_SLOT_PENALTY_EVENING_HOURS
-                    class_slot_count = self.semester.classes[i].slot_count
+        coefficient = constants.COEFFICIENT_SLOT_PENALTY_EVENING_HOURS
 
-                    objective_function += variable * coefficient / class_slot_count
+        for row, class_ in zip(self.variables_matrix, self.semester.classes):
+            class_coefficient = coefficient / class_.slot_count
 
-        return objective_function
+            for j in storage.evening_slot_indices:
+                terms.append((row[j], class_coefficient))
 
-    def _set_constraints_match_class_slot_count(self, model: LpProblem) -> None:
+        return LpAffineExpression(terms)
+
+    def _get_constraints_match_class_slot_count(self) -> Dict[str, LpConstraint]:
         """The sum of each row must equal the number of time slots of the class.
 
-        Args:
-            model (LpProblem): The PuLP model.
+        Returns:
+            Dict[str, LpConstraint]: The constraints by name.
         """
-        for i in range(len(self.variables_matrix)):
-            x = 0
+        constraints = {}
 
-            for j in range(len(self.variables_matrix[0])):
-                x += self.variables_matrix[i][j]
+        for i, (row, class_) in enumerate(zip(self.variables_matrix, self.semester.classes)):
+            constraints[f"{self.semester.id}_slot_count_{i}"] = lpSum(row) == class_.slot_count
 
-            model += x == self.semester.classes[i].slot_count
+        return constraints
 
-    def _set_constraints_consecutive_slots(self, model: LpProblem) -> None:
+    def _get_constraints_consecutive_slots(self) -> Dict[str, LpConstraint]:
         """Force the time slots of each class to be consecutive.
 
-        Args:
-            model (LpProblem): The PuLP model.
+        Returns:
+            Dict[str, LpConstraint]: The constraints by name.
         """
-        slot_count_per_day = utils.get_slot_count_per_day()
-
-        for i in range(len(self.variables_matrix)):
-            class_slot_count = self.semester.classes[i].slot_count
-            Z = 0
+        storage = get_storage()
+        constraints = {}
+        z_count = 0
 
-            for j in range(len(self.variables_matrix[0]) - class_slot_count + 1):
-                if j % slot_count_per_day > slot_count_per_day - class_slot_count:
-                    # Prevents having a class that starts in the evening and ends the next day at the beginning of the day.
-                    continue
+        for i, (row, class_) in enumerate(zip(self.variables_matrix, self.semester.classes)):
+            class_slot_count = class_.slot_count
+            Z = []
 
-                x = 0
+            for j in utils.get_consecutive_slots_start_indices(len(storage.slots), storage.slot_count_per_day, class_slot_count):
+                x = lpSum(row[j : j + class_slot_count])
+                z = utils.create_binary_variable(f"{self.semester.id}_Z_{z_count}")
+                z_count += 1
 
-                for k in range(j, j + class_slot_count):
-                    x += self.variables_matrix[i][k]
+                constraints[f"{self.semester.id}_consecutive_slots_{i}_{j}_upper"] = z <= x / class_slot_count
+                constraints[f"{self.semester.id}_consecutive_slots_{i}_{j}_lower"] = z >= x - class_slot_count + 1
+                Z.append(z)
 
-                z = utils.create_binary_variable(f"{self.semester.id}_Z_{i},{j},{k}")
+            constraints[f"{self.semester.id}_consecutive_slots_{i}"] = lpSum(Z) == 1
 
-                model += z <= x / class_slot_count
-                model += z >= x - class_slot_count + 1
-                Z += z
+        return constraints
 
-            model += Z == 1
-
-    def _set_constraints_class_limits_per_slot(self, model: LpProblem) -> None:
+    def _get_constraints_class_limits_per_slot(self) -> Dict[str, LpConstraint]:
         """Each slot can have a maximum of 1 common class or at least 1 group class.
 
-        Args:
-            model (LpProblem): The PuLP model.
+        Returns:
+            Dict[str, LpConstraint]: The constraints by name.
         """
-        for i in range(len(self.variables_matrix[0])):
-            common_class_variables = 0
-            common_group = self.semester.common_group()
+        storage = get_storage()
 
-            for j in range(len(common_group.classes)):
-                common_class_variables += self.variables_matrix[j][i]
+        # The classes are sorted by group, so the rows of each group are contiguous.
+        common_group = self.semester.common_group()
+        offset = len(common_group.classes)
+        common_class_rows = self.variables_matrix[:offset]
+        group_rows = []
 
-            non_common_groups = self.semester.non_common_groups()
+        for group in self.semester.non_common_groups():
+            group_rows.append(self.variables_matrix[offset : offset + len(group.classes)])
+            offset += len(group.classes)
 
-            if not non_common_groups:
-                model += common_class_variables <= 1
-                continue
+        constraints = {}
 
-            offset = len(common_group.classes)
+        for i in range(len(storage.slots)):
+            common_class_variables = lpSum(common_class_rows[:, i])
 
-            for group in non_common_groups:
-                group_class_variables = 0
+            if not group_rows:
+                constraints[f"{self.semester.id}_class_limits_{i}"] = common_class_variables <= 1
+                continue
 
-                for j in range(len(group.classes)):
-                    group_class_variables += self.variables_matrix[offset + j][i]
+            for k, rows in enumerate(group_rows):
+                group_class_variables = lpSum(rows[:, i])
+                constraints[f"{self.semester.id}_class_limits_{i}_{k}"] = common_class_variables + group_class_variables <= 1
 
-                model += common_class_variables + group_class_variables <= 1
-                offset += len(group.classes)
+        return constraints
 
     def get_objective_function(self) -> LpAffineExpression:
         """Gets the objective function.
@@ -429,50 +395,49 @@ class SemesterSchedule:
 
         return objective_function
 
-    def set_constraints(self, model: LpProblem) -> None:
-        """Sets the constraints.
+    def get_constraints(self) -> Dict[str, LpConstraint]:
+        """Gets the constraints.
 
-        Args:
-            model (LpProblem): The PuLP model.
+        Returns:
+            Dict[str, LpConstraint]: The constraints for the semester by name.
         """
+        constraints = {}
+
         for func in [
-            self._set_constraints_match_class_slot_count,
-            self._set_constraints_consecutive_slots,
-            self._set_constraints_class_limits_per_slot,
+            self._get_constraints_match_class_slot_count,
+            self._get_constraints_consecutive_slots,
+            self._get_constraints_class_limits_per_slot,
         ]:
-            func(model)
+            constraints.update(func())
 
-    @with_storage
-    def get_class_schedules(self, storage: DataStorage) -> List[ClassSchedule]:
-        """Gets the list of class schedules.
+        return constraints
 
-        Args:
-            storage (DataStorage): This parameter is automatically injected.
+    def get_variable_values(self) -> np.ndarray:
+        """Gets the values of the variables matrix once the model is solved.
 
         Returns:
-            List[ClassSchedule]: The list of class schedules.
+            np.ndarray: The m x n matrix of the variable values.
         """
-        class_schedules = []
-
-        for i in range(len(self.semester.classes)):
-            slot_count = 0
-            is_previous_variable_true = False
+        return np.array([[x.varValue for x in row] for row in self.variables_matrix], dtype=np.float64)
 
-            for j in range(len(storage.slots)):
-                is_variable_true = not math.isclose(self.variables_matrix[i][j].varValue, 0)
-
-                if is_variable_true:
-                    slot_count += 1
+    def get_class_schedules(self) -> List[ClassSchedule]:
+        """Gets the list of class schedules.
 
-                class_ = self.semester.classes[i]
+        Returns:
+            List[ClassSchedule]: The list of class schedules.
+        """
+        slots = get_storage().slots
+        class_schedules = []
+        is_allocated = self.get_variable_values() > 0.5
 
-                if is_previous_variable_true and not is_variable_true:
-                    class_schedules.append(ClassSchedule(class_, j - 1, slot_count))
-                    slot_count = 0
-                elif is_variable_true and j == len(storage.slots) - 1:
-                    class_schedules.append(ClassSchedule(class_, len(storage.slots) - 1, slot_count))
+        for class_, row in zip(self.semester.classes, is_allocated):
+            # Pads the row with unallocated slots, so that each run of allocated slots has a start and an end.
+            changes = np.diff(np.concatenate(([0], row.astype(np.int8), [0])))
+            start_slot_indices = np.flatnonzero(changes == 1)
+            end_slot_indices = np.flatnonzero(changes == -1) - 1
 
-                is_previous_variable_true = is_variable_true
+            for start_slot_index, end_slot_index in zip(start_slot_indices, end_slot_indices):
+                class_schedules.append(ClassSchedule(class_, slots[start_slot_index], slots[end_slot_index]))
 
         class_schedules.sort(key=lambda x: x.start_slot.id)
         return class_schedules
@@ -481,19 +446,17 @@ class SemesterSchedule:
 class ClassSchedule:
     """Represents a class schedule."""
 
-    @with_storage
-    def __init__(self, class_: Class_, end_slot_index: int, slot_count: int, storage: DataStorage) -> None:
+    def __init__(self, class_: Class_, start_slot: Slot, end_slot: Slot) -> None:
         """Creates a new instance of the ClassSchedule class.
 
         Args:
             class_ (Class_): The semester for which a schedule will be calculated.
-            end_slot_index (int): The time slot for the last hour of the class.
-            slot_count (int): The number of time slots the class lasts.
-            storage (DataStorage): This parameter is automatically injected.
+            start_slot (Slot): The time slot for the first hour of the class.
+            end_slot (Slot): The time slot for the last hour of the class.
         """
         self.class_ = class_
-        self.start_slot = storage.slots[end_slot_index - slot_count + 1]
-        self.end_slot = storage.slots[end_slot_index]
+        self.start_slot = start_slot
+        self.end_slot = end_slot
 
     def __str__(self):
         """Implementation of str for the class."""
@@ -509,5 +472,8 @@ class ClassSchedule:
         return f"{formatted_weekday}   {start_time_end_time}   {formatted_classs_slot_count}   {formatted_group_name}{self.class_.name}"
 
 
+# Only accessed through get_storage.
+STORAGE: Optional[DataStorage] = None
+
 import parsing
 import utils
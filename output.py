@@ -1,32 +1,49 @@
-import math
+import io
+import sys
 
-import utils
-from models import DataStorage, SemesterSchedule, with_storage
+import numpy as np
+
+from models import DataStorage, SemesterSchedule, get_storage, with_storage
+
+# The output is buffered to avoid a write per printed cell. Each public print_* function flushes it when it finishes.
+_buffer = io.StringIO()
+
+
+def println(*args) -> None:
+    """Calls the print function on the output buffer."""
+    print(*args, file=_buffer)
 
 
 def printnoln(*args) -> None:
-    """Calls the print function without line break."""
-    print(*args, end="")
+    """Calls the print function on the output buffer without line break."""
+    print(*args, end="", file=_buffer)
 
 
-def print_divider(c: str = "-") -> None:
+def flush() -> None:
+    """Writes the output buffer to the standard output and empties it."""
+    sys.stdout.write(_buffer.getvalue())
+    _buffer.seek(0)
+    _buffer.truncate()
+
+
+def _print_divider(c: str = "-") -> None:
     """Displays a divider.
 
     Args:
         c (str, optional): The character used for the divider.. Defaults to "-".
     """
-    print(c * (len(DataStorage().slots) * 2 + 11))
+    println(c * (len(get_storage().slots) * 2 + 11))
 
 
 @with_storage
-def print_variables_matrix_header(storage: DataStorage) -> None:
+def _print_variables_matrix_header(storage: DataStorage) -> None:
     """Displays the variables matrix header.
 
     Args:
         storage (DataStorage): This parameter is automatically injected.
     """
-    print_divider()
-    slot_count_per_day = utils.get_slot_count_per_day()
+    _print_divider()
+    slot_count_per_day = storage.slot_count_per_day
 
     # First row.
     printnoln("| ")
@@ -36,7 +53,7 @@ def print_variables_matrix_header(storage: DataStorage) -> None:
 
         if (i + 1) % slot_count_per_day == 0:
             printnoln("| ")
-    print("<= Jour de la semaine")
+    println("<= Jour de la semaine")
 
     # Second row.
     printnoln("| ")
@@ -46,9 +63,9 @@ def print_variables_matrix_header(storage: DataStorage) -> None:
 
         if (i + 1) % slot_count_per_day == 0:
             printnoln("| ")
-    print("<= Créneau horaire")
+    println("<= Créneau horaire")
 
-    print_divider()
+    _print_divider()
 
 
 @with_storage
@@ -59,14 +76,16 @@ def print_variables_matrix(semester_schedule: SemesterSchedule, storage: DataSto
         semester_schedule (SemesterSchedule): The semester schedule.
         storage (DataStorage): This parameter is automatically injected.
     """
-    print_variables_matrix_header()
-    slot_count_per_day = utils.get_slot_count_per_day()
+    _print_variables_matrix_header()
+    slot_count_per_day = storage.slot_count_per_day
+    values = semester_schedule.get_variable_values()
+    row_sums = values.sum(axis=1)
 
-    for i in range(len(semester_schedule.variables_matrix)):
+    for i in range(len(values)):
         printnoln("| ")
 
-        for j in range(len(semester_schedule.variables_matrix[0])):
-            if math.isclose(semester_schedule.variables_matrix[i][j].varValue, 0):
+        for j in range(len(values[0])):
+            if values[i, j] < 0.5:
                 if storage.slots[j].is_lunch_break:
                     printnoln("  ")
                 else:
@@ -79,7 +98,7 @@ def print_variables_matrix(semester_schedule: SemesterSchedule, storage: DataSto
 
         class_ = semester_schedule.semester.classes[i]
 
-        check_slot_count = sum(semester_schedule.variables_matrix[i][j].varValue for j in range(len(semester_schedule.variables_matrix[0]))) == class_.slot_count
+        check_slot_count = np.isclose(row_sums[i], class_.slot_count)
         check_slot_count_str = "✅" if check_slot_count else "❌"
         class_id_str = str(class_.id).ljust(2)
         class_slot_count = class_.slot_count
@@ -89,9 +108,10 @@ def print_variables_matrix(semester_schedule: SemesterSchedule, storage: DataSto
         printnoln(f"-- {check_slot_count_str} #{class_id_str} [{class_slot_count} h] {formatted_group_name}{class_name}")
 
         sorted_teachers = sorted(x.last_name for x in class_.teachers)
-        print(" (%s)" % ", ".join(sorted_teachers))
+        println(" (%s)" % ", ".join(sorted_teachers))
 
-    print_divider()
+    _print_divider()
+    flush()
 
 
 def print_class_schedules(semester_schedule: SemesterSchedule) -> None:
@@ -101,7 +121,9 @@ def print_class_schedules(semester_schedule: SemesterSchedule) -> None:
         semester_schedule (SemesterSchedule): The semester schedule.
     """
     for class_schedule in semester_schedule.get_class_schedules():
-        print(class_schedule)
+        println(class_schedule)
+
+    flush()
 
 
 @with_storage
@@ -111,9 +133,9 @@ def print_teachers_preferences(storage: DataStorage) -> None:
     Args:
         storage (DataStorage): This parameter is automatically injected.
     """
-    print_variables_matrix_header()
+    _print_variables_matrix_header()
     sorted_teachers = sorted(storage.teachers.values(), key=lambda x: x.last_name)
-    slot_count_per_day = utils.get_slot_count_per_day()
+    slot_count_per_day = storage.slot_count_per_day
 
     for teacher in sorted_teachers:
         printnoln("| ")
@@ -129,16 +151,17 @@ def print_teachers_preferences(storage: DataStorage) -> None:
             if (i + 1) % slot_count_per_day == 0:
                 printnoln("| ")
 
-        print("--", teacher.last_name, teacher.first_name)
+        println("--", teacher.last_name, teacher.first_name)
 
-    print_divider()
+    _print_divider()
 
-    print("5 = Forte préférence")
-    print("4 = Idéalement oui")
-    print("· = Neutre")
-    print("3 = De préférence pas")
-    print("2 = Si pas possible autrement")
-    print("1 = Pas disponible")
+    println("5 = Forte préférence")
+    println("4 = Idéalement oui")
+    println("· = Neutre")
+    println("3 = De préférence pas")
+    println("2 = Si pas possible autrement")
+    println("1 = Pas disponible")
+    flush()
 
 
 def print_results(semester_schedules: SemesterSchedule) -> None:
@@ -148,17 +171,18 @@ def print_results(semester_schedules: SemesterSchedule) -> None:
         semester_schedules (SemesterSchedule): The semester schedules.
     """
     for semester_schedule in semester_schedules:
-        print_divider("*")
-        print(semester_schedule.semester.name)
-        print_divider("*")
-        print()
+        _print_divider("*")
+        println(semester_schedule.semester.name)
+        _print_divider("*")
+        println()
 
         print_variables_matrix(semester_schedule)
 
         print_class_schedules(semester_schedule)
-        print()
+        println()
 
-    print_divider("*")
+    _print_divider("*")
 
-    print("\nPréférences des professeurs:")
+    println("\nPréférences des professeurs:")
     print_teachers_preferences()
+    flush()
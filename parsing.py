@@ -1,3 +1,4 @@
+import ast
 import csv
 from typing import Dict, List
 
@@ -17,23 +18,23 @@ def load_teachers() -> Dict[int, List[Teacher]]:
         reader = csv.reader(f, delimiter=";")
 
         for row in reader:
-            slot_preferences = []
+            id, last_name, first_name, *preferences = row
+            preferences = [int(x) for x in preferences]
 
             # WARNING: If the storage of teacher preferences changes, this code will no longer work.
-            for i, x in enumerate(row[3:]):
-                x = int(x)
+            # Each day has 3 preferences: for 4 slots followed by the lunch break, for 4 slots and for 6 slots.
+            slot_preferences = [None] * (len(preferences) // 3 * 15)
 
-                if i % 3 == 0:
-                    slot_preferences += [x] * 4 + [None]
-                elif i % 3 == 1:
-                    slot_preferences += [x] * 4
-                else:
-                    slot_preferences += [x] * 6
+            for i in range(0, len(preferences) - 2, 3):
+                offset = i // 3 * 15
+                slot_preferences[offset : offset + 4] = [preferences[i]] * 4
+                slot_preferences[offset + 5 : offset + 9] = [preferences[i + 1]] * 4
+                slot_preferences[offset + 9 : offset + 15] = [preferences[i + 2]] * 6
 
             item = Teacher(
-                id=int(row[0]),
-                last_name=row[1],
-                first_name=row[2],
+                id=int(id),
+                last_name=last_name,
+                first_name=first_name,
                 slot_preferences=slot_preferences,
             )
             data[item.id] = item
@@ -56,7 +57,7 @@ def load_classes() -> List[Semester]:
         id = 1
 
         for row in reader:
-            semester_name = row[2]
+            class_id, name, semester_name, group_name, slot_count, teacher_ids = row
 
             if not semester_name in identifiers:
                 identifiers[semester_name] = id
@@ -64,11 +65,11 @@ def load_classes() -> List[Semester]:
                 id += 1
 
             class_ = Class_(
-                id=int(row[0]),
-                name=row[1],
-                group_name=row[3],
-                slot_count=int(row[4]),
-                teachers=eval(row[5]),
+                id=int(class_id),
+                name=name,
+                group_name=group_name,
+                slot_count=int(slot_count),
+                teachers=ast.literal_eval(teacher_ids),
             )
             semesters[identifiers[semester_name]].classes.append(class_)
 
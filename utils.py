@@ -1,8 +1,15 @@
+import functools
+import json
+import os
+from typing import Tuple
+
+import numpy as np
 import pulp as PuLP
-from pulp import LpVariable
+from pulp import LpBinary, LpProblem, LpSolver, LpVariable
 
 import constants
-from models import DataStorage, with_storage
+
+SOLUTION_FILE_PATH = "./solution.json"
 
 
 def create_binary_variable(name: str) -> LpVariable:
@@ -14,7 +21,86 @@ def create_binary_variable(name: str) -> LpVariable:
     Returns:
         LpVariable: The variable.
     """
-    return LpVariable(name, lowBound=0, upBound=1, cat=PuLP.const.LpInteger)
+    return LpVariable(name, cat=LpBinary)
+
+
+def create_binary_variables_matrix(name: str, m: int, n: int) -> np.ndarray:
+    """Creates a matrix of PuLP binary variables.
+
+    Args:
+        name (str): The variable name. The row and column indices replace its %s placeholders, or are appended to it.
+        m (int): The number of rows.
+        n (int): The number of columns.
+
+    Returns:
+        np.ndarray: The m x n matrix of variables.
+    """
+    variables = np.empty((m, n), dtype=object)
+    variables[:] = LpVariable.matrix(name, (range(m), range(n)), cat=LpBinary)
+    return variables
+
+
+def get_solver(warm_start: bool = False) -> LpSolver:
+    """Gets the solver used to solve the model.
+
+    HiGHS is used if its executable is available, otherwise the CBC solver bundled with PuLP.
+
+    Args:
+        warm_start (bool, optional): Use the initial values of the variables as a MIP start, see supports_warm_start. Defaults to False.
+
+    Returns:
+        LpSolver: The solver.
+    """
+    if PuLP.HiGHS_CMD().available():
+        return PuLP.HiGHS_CMD()
+
+    return PuLP.PULP_CBC_CMD(threads=os.cpu_count(), warmStart=warm_start)
+
+
+def supports_warm_start() -> bool:
+    """Checks if the solver returned by get_solver can start from a previously saved solution.
+
+    Returns:
+        bool: True, if the solver supports warm starts otherwise False.
+    """
+    # HiGHS_CMD ignores the initial values of the variables.
+    return not PuLP.HiGHS_CMD().available()
+
+
+def load_solution(model: LpProblem) -> bool:
+    """Uses the previously saved solution as the initial values of the model variables.
+
+    Args:
+        model (LpProblem): The PuLP model.
+
+    Returns:
+        bool: True, if a previous solution was loaded otherwise False.
+    """
+    # A missing or unreadable file is treated as no previous solution.
+    try:
+        with open(SOLUTION_FILE_PATH, "r") as f:
+            values = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if not isinstance(values, dict):
+        return False
+
+    for variable in model.variables():
+        if variable.name in values:
+            variable.setInitialValue(values[variable.name])
+
+    return True
+
+
+def save_solution(model: LpProblem) -> None:
+    """Saves the solution, so that the next run can start from it.
+
+    Args:
+        model (LpProblem): The PuLP model.
+    """
+    with open(SOLUTION_FILE_PATH, "w") as f:
+        json.dump({x.name: x.varValue for x in model.variables()}, f)
 
 
 def get_slot_count_per_day_(slot_count: int = None) -> int:
@@ -29,14 +115,17 @@ def get_slot_count_per_day_(slot_count: int = None) -> int:
     return slot_count // constants.NUMBER_OF_CLASS_DAYS
 
 
-@with_storage
-def get_slot_count_per_day(storage: DataStorage) -> int:
-    """Gets the number of slots per day.
+@functools.lru_cache
+def get_consecutive_slots_start_indices(slot_count: int, slot_count_per_day: int, class_slot_count: int) -> Tuple[int, ...]:
+    """Gets the indices of the slots at which a class can start.
 
     Args:
-        storage (DataStorage): This parameter is automatically injected.
+        slot_count (int): The total number of slots.
+        slot_count_per_day (int): The number of slots per day.
+        class_slot_count (int): The number of time slots the class lasts.
 
     Returns:
-        int: The number of slots per day.
+        Tuple[int, ...]: The start slot indices.
     """
-    return get_slot_count_per_day_(len(storage.slots))
+    # Prevents having a class that starts in the evening and ends the next day at the beginning of the day.
+    return tuple(j for j in range(slot_count - class_slot_count + 1) if j % slot_count_per_day <= slot_count_per_day - class_slot_count)